@@ -1,11 +1,22 @@
 import streamlit as st
 import gspread
 import pandas as pd
+import pyarrow as pa
+import contextlib
 import datetime
+import hashlib
+import itertools
+import os
+import pathlib
+import time
+import asyncio
+import threading
+import aiohttp
+import orjson
+import google.auth.transport.requests
 from google.oauth2.credentials import Credentials
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 
 # --- Page Configuration ---
 st.set_page_config(page_title="YouTube Analytics Dashboard", page_icon="📊", layout="wide")
@@ -18,10 +29,62 @@ SCOPES = [
     "https://www.googleapis.com/auth/youtube.readonly" # Added for channel verification
 ]
 
+# REST endpoints we call directly instead of going through the Discovery client
+YOUTUBE_CHANNELS_URL = "https://youtube.googleapis.com/youtube/v3/channels"
+YOUTUBE_ANALYTICS_URL = "https://youtubeanalytics.googleapis.com/v2/reports"
+# Google access tokens expire after an hour, which bounds how long anything keyed on one stays useful
+ACCESS_TOKEN_LIFETIME = 3600  # seconds
+# Google only serves gzip-compressed responses when the User-Agent also contains "gzip"
+HTTP_HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "reindexation (gzip)"}
+
+# Column types of the Analytics report, so the response can be loaded straight into Arrow.
+# This is the expanded list of metrics to make it more like YT Studio.
+# Daily counters, watch minutes included, fit comfortably in uint32, halving the frame's footprint;
+# averageViewDuration is whole seconds, so it is a counter too and never picks up float rounding noise.
+ANALYTICS_SCHEMA = pa.schema([
+    ("day", pa.date32()),
+    ("views", pa.uint32()),
+    ("redViews", pa.uint32()),
+    ("comments", pa.uint32()),
+    ("likes", pa.uint32()),
+    ("dislikes", pa.uint32()),
+    ("shares", pa.uint32()),
+    ("estimatedMinutesWatched", pa.uint32()),
+    ("averageViewDuration", pa.uint32()),
+    ("subscribersGained", pa.uint32()),
+    ("subscribersLost", pa.uint32())
+])
+# The report query is derived from the schema, so the requested metrics and their types cannot drift apart
+ANALYTICS_DIMENSION = ANALYTICS_SCHEMA.names[0]
+ANALYTICS_METRICS = ",".join(ANALYTICS_SCHEMA.names[1:])
+
+# At most this many Analytics reports are requested at once, to stay within the per-minute quota
+ANALYTICS_CONCURRENCY = 8
+
+# Transient API failures (429s, 5xx, dropped connections) are retried with jittered exponential backoff
+API_RETRY_ATTEMPTS = 5
+API_RETRY_MAX_WAIT = 30  # seconds
+
+# Cached gspread clients each keep a connection pool open, so only the most recent ones are kept
+SHEETS_CLIENT_CACHE_SIZE = 16
+
+# Rows per Sheets append, keeping every request well under the API's payload limit
+SHEETS_CHUNK_ROWS = 5000
+# RAW writes store date text as plain strings, so dates are sent as Sheets serial numbers (days since
+# 1899-12-30, which is 25569 days before the Unix epoch) and the written cells get a date format
+SHEETS_EPOCH_OFFSET = 25569
+SHEETS_DATE_FORMAT = {"numberFormat": {"type": "DATE", "pattern": "yyyy-mm-dd"}}
+
+# Channel lookups are also kept on disk, so a new session with the same token skips the API call
+CHANNEL_CACHE_PATH = pathlib.Path("~/.cache/reindexation/channels.json").expanduser()
+CHANNEL_CACHE_TTL = ACCESS_TOKEN_LIFETIME
+
 # --- Secrets Management ---
 # Loads credentials from Streamlit's secrets management
-try:
-    CLIENT_CONFIG = {
+@st.cache_resource
+def load_settings():
+    """Reads the OAuth client config and target IDs from secrets once per server process."""
+    client_config = {
         "web": {
             "client_id": st.secrets["GOOGLE_CLIENT_ID"],
             "project_id": st.secrets.get("GOOGLE_PROJECT_ID", ""), # Optional
@@ -33,8 +96,10 @@ try:
         }
     }
     # We add .strip() to remove any accidental invisible spaces from the secrets
-    TARGET_CHANNEL_ID = st.secrets["YOUTUBE_CHANNEL_ID"].strip()
-    GOOGLE_SHEET_ID = st.secrets["GOOGLE_SHEET_ID"].strip()
+    return client_config, st.secrets["YOUTUBE_CHANNEL_ID"].strip(), st.secrets["GOOGLE_SHEET_ID"].strip()
+
+try:
+    CLIENT_CONFIG, TARGET_CHANNEL_ID, GOOGLE_SHEET_ID = load_settings()
 except KeyError as e:
     st.error(f"🔴 Critical Error: Missing secret key - {e}. Please configure your secrets in the Streamlit app settings.")
     st.stop()
@@ -44,6 +109,49 @@ if 'credentials' not in st.session_state:
     st.session_state.credentials = None
 
 # --- Helper Functions ---
+def _is_transient_error(exception):
+    """Tells whether a failed API call is worth retrying."""
+    if isinstance(exception, aiohttp.ClientResponseError):
+        return exception.status == 429 or exception.status >= 500
+    if isinstance(exception, gspread.exceptions.APIError):
+        return exception.response.status_code == 429 or exception.response.status_code >= 500
+    return isinstance(exception, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+_exponential_backoff = wait_random_exponential(multiplier=0.5, max=API_RETRY_MAX_WAIT)
+
+def _retry_wait(retry_state):
+    """Waits as long as the API's Retry-After header asks, falling back to jittered exponential backoff."""
+    exception = retry_state.outcome.exception()
+    if isinstance(exception, aiohttp.ClientResponseError):
+        headers = exception.headers or {}
+    else:
+        headers = exception.response.headers if isinstance(exception, gspread.exceptions.APIError) else {}
+    retry_after = headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), API_RETRY_MAX_WAIT)
+    return _exponential_backoff(retry_state)
+
+# reraise=True hands the last error to the callers' except clauses instead of wrapping it in RetryError
+retry_transient_errors = retry(
+    retry=retry_if_exception(_is_transient_error),
+    wait=_retry_wait,
+    stop=stop_after_attempt(API_RETRY_ATTEMPTS),
+    reraise=True
+)
+
+def _is_rejected_write(exception):
+    """Tells whether a Sheets write was throttled, i.e. rejected before anything was written."""
+    return isinstance(exception, gspread.exceptions.APIError) and exception.response.status_code == 429
+
+# values.append is not idempotent: after a 5xx or a dropped connection the rows may already be in the sheet,
+# so writes are only retried when Sheets has refused them outright
+retry_rejected_writes = retry(
+    retry=retry_if_exception(_is_rejected_write),
+    wait=_retry_wait,
+    stop=stop_after_attempt(API_RETRY_ATTEMPTS),
+    reraise=True
+)
+
 def get_credentials_from_session():
     """Retrieves credentials from Streamlit's session state."""
     if st.session_state.credentials:
@@ -58,64 +166,268 @@ def save_credentials_to_session(credentials):
         'token_uri': credentials.token_uri,
         'client_id': credentials.client_id,
         'client_secret': credentials.client_secret,
-        'scopes': credentials.scopes
+        'scopes': credentials.scopes,
+        # Kept so credentials.expired works and the token is refreshed before the API calls reject it
+        'expiry': credentials.expiry.isoformat() + 'Z' if credentials.expiry else None
     }
 
+def get_auth_flow():
+    """Returns this session's OAuth flow, creating it and its authorization URL on first use."""
+    # The flow holds the user's token after fetch_token, so it lives in session state rather than a shared cache
+    if 'auth_flow' not in st.session_state:
+        flow = Flow.from_client_config(
+            CLIENT_CONFIG,
+            scopes=SCOPES,
+            redirect_uri=CLIENT_CONFIG["web"]["redirect_uris"][0]
+        )
+        st.session_state.auth_url, _ = flow.authorization_url(prompt='consent')
+        st.session_state.auth_flow = flow
+    return st.session_state.auth_flow
+
+def get_access_token(credentials):
+    """Returns a valid access token, refreshing the credentials first if they have expired."""
+    if credentials.expired:
+        credentials.refresh(google.auth.transport.requests.Request())
+        save_credentials_to_session(credentials)
+    return credentials.token
+
+@st.cache_resource
+def _event_loop():
+    """Starts a background event loop that outlives reruns, so HTTP connections can be reused."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def _run(coro):
+    """Runs a coroutine on the shared event loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+@st.cache_resource
+def _http_session():
+    """Creates the keep-alive aiohttp session shared by every API call."""
+    async def _create():
+        connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
+        # A stalled connection fails after 30s (and is retried) instead of holding a pool slot for aiohttp's 5-minute default
+        timeout = aiohttp.ClientTimeout(total=30)
+        return aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, timeout=timeout, raise_for_status=True)
+    return _run(_create())
+
+@retry_transient_errors
+async def _list_channels(session, token):
+    """Calls channels.list on the YouTube Data API v3 for the authenticated user."""
+    params = {"part": "snippet", "mine": "true"}
+    headers = {"Authorization": f"Bearer {token}"}
+    async with session.get(YOUTUBE_CHANNELS_URL, params=params, headers=headers) as response:
+        data = orjson.loads(await response.read())
+    return data.get("items", [])
+
+@retry_transient_errors
+async def _fetch_analytics(session, token, channel_id, start_iso, end_iso):
+    """Calls reports.query on the YouTube Analytics API v2 and returns the raw JSON response."""
+    params = {
+        "ids": f"channel=={channel_id}",
+        "startDate": start_iso,
+        "endDate": end_iso,
+        "metrics": ANALYTICS_METRICS,
+        "dimensions": ANALYTICS_DIMENSION,
+        "sort": ANALYTICS_DIMENSION
+    }
+    headers = {"Authorization": f"Bearer {token}"}
+    async with session.get(YOUTUBE_ANALYTICS_URL, params=params, headers=headers) as response:
+        return orjson.loads(await response.read())
+
+async def _fetch_analytics_for_channels(session, token, channel_ids, start_iso, end_iso):
+    """Fetches the reports for several channels concurrently over one session, in channel order."""
+    semaphore = asyncio.Semaphore(ANALYTICS_CONCURRENCY)
+    async def _fetch_one(channel_id):
+        async with semaphore:
+            return await _fetch_analytics(session, token, channel_id, start_iso, end_iso)
+    return await asyncio.gather(*(_fetch_one(channel_id) for channel_id in channel_ids))
+
+def _report_to_dataframe(response):
+    """Converts an Analytics report into an Arrow-backed DataFrame."""
+    # A range with no data may omit rows or send an empty list; both get the typed, empty columns
+    if not response.get('rows'):
+        return ANALYTICS_SCHEMA.empty_table().to_pandas(types_mapper=pd.ArrowDtype)
+    column_headers = [header['name'] for header in response['columnHeaders']]
+    # Transpose the row-major response once and build typed Arrow columns directly
+    columns = zip(*response['rows'])
+    table = pa.Table.from_arrays(
+        [pa.array(column).cast(ANALYTICS_SCHEMA.field(name).type) for name, column in zip(column_headers, columns)],
+        names=column_headers
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def _read_channel_cache():
+    """Loads the on-disk channel cache, treating a missing or corrupt file as empty."""
+    try:
+        cache = orjson.loads(CHANNEL_CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    # Valid JSON of the wrong shape is corrupt too; keep only well-formed [timestamp, channels] entries
+    return {
+        key: entry for key, entry in cache.items()
+        if isinstance(entry, list) and len(entry) == 2
+        and isinstance(entry[0], (int, float)) and isinstance(entry[1], list)
+    }
+
+def _write_channel_cache(token_hash, channels):
+    """Stores the channels for a token, dropping expired entries and replacing the file atomically."""
+    now = time.time()
+    cache = {key: entry for key, entry in _read_channel_cache().items() if now - entry[0] < CHANNEL_CACHE_TTL}
+    # Only the fields the UI reads are kept
+    cache[token_hash] = (now, [{"id": ch["id"], "snippet": {"title": ch["snippet"]["title"]}} for ch in channels])
+    tmp_path = CHANNEL_CACHE_PATH.with_name(f"{CHANNEL_CACHE_PATH.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        CHANNEL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(orjson.dumps(cache))
+        os.replace(tmp_path, CHANNEL_CACHE_PATH)
+    except OSError:
+        # The cache is only an optimization; the next session simply calls the API again
+        with contextlib.suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+
+def _summarize_channels(channels):
+    """Builds the set of channel IDs and the name/ID table from channels.list items in one go."""
+    # reindex rather than [[...]] so an account with no channels still gets both columns
+    channel_df = (
+        pd.json_normalize(channels)
+        .reindex(columns=['snippet.title', 'id'])
+        .rename(columns={'snippet.title': "Channel Name", 'id': "Channel ID"})
+        .convert_dtypes(dtype_backend='pyarrow')
+    )
+    return frozenset(channel_df["Channel ID"]), channel_df
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_channels(token):
+    """Lists the accessible channels once per access token; errors are raised, so they are never cached."""
+    token_hash = hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+    entry = _read_channel_cache().get(token_hash)
+    if entry and time.time() - entry[0] < CHANNEL_CACHE_TTL:
+        return _summarize_channels(entry[1])
+    channels = _run(_list_channels(_http_session(), token))
+    _write_channel_cache(token_hash, channels)
+    return _summarize_channels(channels)
+
 def get_accessible_channels(credentials):
-    """Uses the YouTube Data API v3 to list channels accessible by the user."""
+    """Uses the YouTube Data API v3 to list channels accessible by the user, as (channel IDs, name/ID table)."""
     try:
-        youtube_service = build('youtube', 'v3', credentials=credentials)
-        request = youtube_service.channels().list(
-            part="snippet",
-            mine=True
-        )
-        response = request.execute()
-        return response.get("items", [])
-    except HttpError as e:
+        return _cached_channels(get_access_token(credentials))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         st.error(f"An error occurred while checking accessible channels: {e}")
         return None
 
-def fetch_youtube_data(credentials, channel_id, start_date, end_date):
-    """Fetches a comprehensive set of data from the YouTube Analytics API."""
-    try:
-        youtube_service = build('youtubeAnalytics', 'v2', credentials=credentials)
-        
-        # This is the new, expanded list of metrics to make it more like YT Studio
-        request = youtube_service.reports().query(
-            ids=f"channel=={channel_id}",
-            startDate=start_date.strftime("%Y-%m-%d"),
-            endDate=end_date.strftime("%Y-%m-%d"),
-            metrics="views,redViews,comments,likes,dislikes,shares,estimatedMinutesWatched,averageViewDuration,subscribersGained,subscribersLost",
-            dimensions="day",
-            sort="day"
-        )
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_reports(token, channel_ids, start_iso, end_iso):
+    """Fetches the reports once per token, channels and date range; errors are raised, so they are never cached."""
+    responses = _run(_fetch_analytics_for_channels(_http_session(), token, channel_ids, start_iso, end_iso))
+    frames = [_report_to_dataframe(response) for response in responses]
+    if len(channel_ids) == 1:
+        return frames[0]
+    # Several channels need a regular channel column (not an index level) so the rows also stay distinguishable in the sheet
+    for channel_id, frame in zip(channel_ids, frames):
+        frame.insert(0, "channel", pd.Series(channel_id, index=frame.index, dtype=pd.ArrowDtype(pa.string())))
+    return pd.concat(frames, ignore_index=True)
 
-        response = request.execute()
-        
-        if 'rows' in response:
-            column_headers = [header['name'] for header in response['columnHeaders']]
-            df = pd.DataFrame(response['rows'], columns=column_headers)
-            return df
-        else:
-            return pd.DataFrame()
-    except HttpError as e:
-        if e.resp.status == 403:
-            st.error(f"🛑 HTTP 403 Forbidden Error: The authenticated user does not have permission for the requested channel ({channel_id}). This is an issue with the channel's permissions on YouTube's side.")
+def fetch_youtube_data(credentials, channel_ids, start_iso, end_iso):
+    """Fetches a comprehensive set of data from the YouTube Analytics API for each of the given channels (ISO date strings)."""
+    # Drop duplicate channels, keeping their order, so no report is fetched twice
+    channel_ids = tuple(dict.fromkeys(channel_ids))
+    if not channel_ids:
+        return pd.DataFrame()
+    try:
+        # Keyed on the token as well, so one user's reports are never served to another
+        return _cached_reports(get_access_token(credentials), channel_ids, start_iso, end_iso)
+    except aiohttp.ClientResponseError as e:
+        if e.status == 403:
+            st.error(f"🛑 HTTP 403 Forbidden Error: The authenticated user does not have permission for the requested channel ({', '.join(channel_ids)}). This is an issue with the channel's permissions on YouTube's side.")
         else:
             st.error(f"An error occurred while fetching YouTube data: {e}")
         return None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        st.error(f"An error occurred while fetching YouTube data: {e}")
+        return None
+    except (pa.ArrowException, KeyError) as e:
+        # A value that does not fit its declared type, or a column missing from ANALYTICS_SCHEMA
+        st.error(f"The YouTube Analytics response did not match the expected report format: {e}")
+        return None
+
+@st.cache_resource(ttl=ACCESS_TOKEN_LIFETIME, max_entries=SHEETS_CLIENT_CACHE_SIZE)
+def _sheets_client(token):
+    """Authorizes a gspread client once per access token, so its HTTP session is reused."""
+    return gspread.authorize(Credentials(token=token))
+
+@st.cache_resource(ttl=ACCESS_TOKEN_LIFETIME, max_entries=SHEETS_CLIENT_CACHE_SIZE)
+@retry_transient_errors
+def _worksheet(token, sheet_id):
+    """Resolves the first worksheet of a spreadsheet once per access token, skipping the metadata call on later writes."""
+    return _sheets_client(token).open_by_key(sheet_id).sheet1
+
+@retry_transient_errors
+def _header_row(sheet):
+    """Reads the first row of the worksheet; being read-only, it is safe to retry."""
+    return sheet.row_values(1)
+
+@retry_transient_errors
+def _format_cells(sheet, cell_range, cell_format):
+    """Applies a format to a range; setting the same format twice is harmless, so it is safe to retry."""
+    sheet.format(cell_range, cell_format)
+
+@retry_rejected_writes
+def _append_rows(sheet, rows):
+    """Appends one chunk of rows to the worksheet and returns the API response."""
+    return sheet.append_rows(rows, value_input_option='RAW')
+
+def _appended_rows(response):
+    """Returns the first and last sheet row numbers covered by an append response."""
+    start, _, end = response["updates"]["updatedRange"].rsplit("!", 1)[-1].partition(":")
+    return gspread.utils.a1_to_rowcol(start)[0], gspread.utils.a1_to_rowcol(end or start)[0]
+
+def _to_sheets_dates(dataframe):
+    """Converts the Arrow date columns to Sheets serial numbers, returning the frame and those columns' positions."""
+    date_positions = [
+        position for position, dtype in enumerate(dataframe.dtypes)
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_date32(dtype.pyarrow_dtype)
+    ]
+    serials = {
+        dataframe.columns[position]: dataframe.iloc[:, position].astype(pd.ArrowDtype(pa.int32())) + SHEETS_EPOCH_OFFSET
+        for position in date_positions
+    }
+    return dataframe.assign(**serials), date_positions
 
 def write_to_sheet(credentials, sheet_id, dataframe):
     """Writes a Pandas DataFrame to the specified Google Sheet."""
+    # Nothing to write, so skip opening the spreadsheet at all
+    if dataframe.empty:
+        return True
     try:
-        gc = gspread.authorize(credentials)
-        sheet = gc.open_by_key(sheet_id).sheet1
+        sheet = _worksheet(get_access_token(credentials), sheet_id)
+        dataframe, date_positions = _to_sheets_dates(dataframe)
         
-        existing_headers = sheet.get_all_values()
+        # Arrow-backed frames yield pd.NA for missing cells, which is not JSON-serializable, so nulls become None (an empty cell)
+        payload = dataframe.astype(object).where(dataframe.notna(), None)
+        # Plain row tuples serialize to JSON arrays as-is, so they are not re-boxed into lists
+        rows = payload.itertuples(index=False, name=None)
+        # Only the first row is needed to tell whether the sheet is empty, not the whole sheet
+        existing_headers = _header_row(sheet)
         if not existing_headers:
-            sheet.update([dataframe.columns.values.tolist()], 'A1')
+            # Send the header row in the same request as the data instead of a separate update
+            rows = itertools.chain([tuple(dataframe.columns)], rows)
+        elif existing_headers != [str(column) for column in dataframe.columns]:
+            # Appending anyway would shift every value under the wrong heading
+            st.error(f"🛑 The Google Sheet's header row ({', '.join(existing_headers)}) does not match the data being written ({', '.join(map(str, dataframe.columns))}). Nothing was written; use an empty sheet or fix the header row.")
+            return False
             
-        sheet.append_rows(dataframe.values.tolist(), value_input_option='USER_ENTERED')
+        # RAW skips Sheets' server-side parsing of every cell; chunks are sent in order so rows stay sorted
+        rows = list(rows)
+        written = [_appended_rows(_append_rows(sheet, rows[start:start + SHEETS_CHUNK_ROWS])) for start in range(0, len(rows), SHEETS_CHUNK_ROWS)]
+        # Format only the rows just written, so existing cells keep whatever format they already have
+        first_row, last_row = written[0][0], written[-1][1]
+        for position in date_positions:
+            column = gspread.utils.rowcol_to_a1(1, position + 1)[:-1]
+            _format_cells(sheet, f"{column}{first_row}:{column}{last_row}", SHEETS_DATE_FORMAT)
         return True
     except Exception as e:
         st.error(f"An error occurred while writing to Google Sheets: {e}")
@@ -130,14 +442,9 @@ if creds is None:
     st.header("Step 1: Authenticate with Google")
     st.write("Click the button below to grant access to your YouTube Analytics and Google Sheets data.")
     
-    flow = Flow.from_client_config(
-        CLIENT_CONFIG,
-        scopes=SCOPES,
-        redirect_uri=st.secrets["REDIRECT_URI"]
-    )
-    auth_url, _ = flow.authorization_url(prompt='consent')
+    flow = get_auth_flow()
     
-    st.link_button("Authorize with Google", auth_url, help="You will be redirected to a Google login page.")
+    st.link_button("Authorize with Google", st.session_state.auth_url, help="You will be redirected to a Google login page.")
 
     # Check for the authorization code in the URL query parameters
     auth_code = st.query_params.get("code")
@@ -149,48 +456,46 @@ if creds is None:
             st.rerun() 
         except Exception as e:
             st.error(f"Authentication failed: {e}")
-else:
-    # --- Main App Interface (Authenticated) ---
-    st.success("✅ Step 1 Complete: You are authenticated!")
-    st.header("Step 2: Verify Channel Access & Fetch Data")
+    # Nothing below applies until the user is signed in, so end this script run here
+    st.stop()
 
-    with st.spinner("Checking which channels your account can access..."):
-        accessible_channels = get_accessible_channels(creds)
-    
-    if accessible_channels is not None:
-        accessible_ids = [ch['id'] for ch in accessible_channels]
-        if TARGET_CHANNEL_ID in accessible_ids:
-            st.success(f"✅ Permission Confirmed! You can now fetch data for the channel: {TARGET_CHANNEL_ID}")
-            
-            end_date = datetime.date.today() - datetime.timedelta(days=1)
-            start_date = st.date_input("Select start date", end_date - datetime.timedelta(days=7))
+# --- Main App Interface (Authenticated) ---
+st.success("✅ Step 1 Complete: You are authenticated!")
+st.header("Step 2: Verify Channel Access & Fetch Data")
+
+with st.spinner("Checking which channels your account can access..."):
+    accessible_channels = get_accessible_channels(creds)
+
+if accessible_channels is not None:
+    accessible_ids, channel_data = accessible_channels
+    if TARGET_CHANNEL_ID in accessible_ids:
+        st.success(f"✅ Permission Confirmed! You can now fetch data for the channel: {TARGET_CHANNEL_ID}")
+        
+        end_date = datetime.date.today() - datetime.timedelta(days=1)
+        start_date = st.date_input("Select start date", end_date - datetime.timedelta(days=7))
 
-            if st.button("Fetch & Update Now", type="primary"):
-                with st.spinner("Fetching data from YouTube..."):
-                    df = fetch_youtube_data(creds, TARGET_CHANNEL_ID, start_date, end_date)
+        if st.button("Fetch & Update Now", type="primary"):
+            with st.spinner("Fetching data from YouTube..."):
+                df = fetch_youtube_data(creds, [TARGET_CHANNEL_ID], start_date.isoformat(), end_date.isoformat())
+            
+            if df is not None and not df.empty:
+                st.balloons()
+                st.write("### Fetched Data")
+                st.dataframe(df)
                 
-                if df is not None and not df.empty:
-                    st.balloons()
-                    st.write("### Fetched Data")
-                    st.dataframe(df)
-                    
-                    with st.spinner("Writing data to Google Sheet..."):
-                        success = write_to_sheet(creds, GOOGLE_SHEET_ID, df)
-                    
-                    if success:
-                        st.success("Google Sheet updated successfully!")
-                        sheet_url = f"https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}"
-                        st.markdown(f"**[View your Google Sheet]({sheet_url})**")
-                elif df is not None and df.empty:
-                    st.warning("No data found for the selected date range.")
-                else:
-                    st.error("Failed to fetch data.")
-        else:
-            st.error(f"❌ PERMISSION MISMATCH: The Target Channel ID from your secrets (`{TARGET_CHANNEL_ID}`) was NOT found in the list of channels your personal account can manage.")
-            st.write("Your personal account has API access to the following channels:")
-            channel_data = {
-                "Channel Name": [ch['snippet']['title'] for ch in accessible_channels],
-                "Channel ID": [ch['id'] for ch in accessible_channels]
-            }
-            st.dataframe(pd.DataFrame(channel_data))
-            st.warning("To fix this, either grant 'Manager' access to the target channel or update the `YOUTUBE_CHANNEL_ID` in your secrets to match one of the channels listed above.")
+                with st.spinner("Writing data to Google Sheet..."):
+                    success = write_to_sheet(creds, GOOGLE_SHEET_ID, df)
+                
+                if success:
+                    st.success("Google Sheet updated successfully!")
+                    sheet_url = f"https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}"
+                    st.markdown(f"**[View your Google Sheet]({sheet_url})**")
+            elif df is not None and df.empty:
+                st.warning("No data found for the selected date range.")
+            else:
+                st.error("Failed to fetch data.")
+    else:
+        st.error(f"❌ PERMISSION MISMATCH: The Target Channel ID from your secrets (`{TARGET_CHANNEL_ID}`) was NOT found in the list of channels your personal account can manage.")
+        st.write("Your personal account has API access to the following channels:")
+        st.dataframe(channel_data)
+        st.warning("To fix this, either grant 'Manager' access to the target channel or update the `YOUTUBE_CHANNEL_ID` in your secrets to match one of the channels listed above.")